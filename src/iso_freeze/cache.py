@@ -0,0 +1,144 @@
+"""Cache pip install --report results between runs."""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Final, Optional
+
+from iso_freeze.lib import PyPackage
+
+
+def get_cache_dir() -> Path:
+    """Return directory to store iso-freeze's cache in.
+
+    Returns:
+        $XDG_CACHE_HOME/iso-freeze, or ~/.cache/iso-freeze (Path)
+    """
+    xdg_cache_home: str = os.environ.get("XDG_CACHE_HOME", "")
+    # As per the XDG spec, ignore XDG_CACHE_HOME if it is empty or relative
+    if not os.path.isabs(xdg_cache_home):
+        return Path(Path.home(), ".cache", "iso-freeze")
+    return Path(xdg_cache_home, "iso-freeze")
+
+
+CACHE_DIR: Final[Path] = get_cache_dir()
+REPORT_CACHE_DIR: Final[Path] = Path(CACHE_DIR, "reports")
+# Cached reports older than this (in seconds) are ignored, so new releases of
+# unpinned requirements are eventually picked up
+MAX_CACHE_AGE: Final[int] = 24 * 60 * 60
+# Bump whenever the format of cached reports changes, so old entries are ignored
+CACHE_FORMAT_VERSION: Final[int] = 1
+
+
+def build_cache_key(
+    file: Path,
+    pip_version_output: str,
+    pip_args: Optional[list[str]],
+    optional_dependency: Optional[str],
+) -> str:
+    """Build key identifying a pip report for the given inputs.
+
+    Arguments:
+        file -- Input file to parse (Path)
+        pip_version_output -- pip --version output of the interpreter used (str)
+        pip_args -- Args to pass to pip install (Optional[list[str]])
+        optional_dependency -- Optional dependency to include (Optional[str])
+
+    Returns:
+        Hex digest of all inputs (str)
+    """
+    key = hashlib.blake2b(file.read_bytes(), digest_size=16)
+    for value in (
+        CACHE_FORMAT_VERSION,
+        # Input files may reference other files relative to their own location
+        # (e.g. '-r base.in') or to the working directory (e.g. '-e .')
+        str(file.resolve()),
+        os.getcwd(),
+        # pip --version output contains pip's version, location and the Python
+        # version, so it changes whenever the interpreter or its pip changes
+        pip_version_output,
+        pip_args,
+        optional_dependency,
+    ):
+        # Separate values so that adjacent ones can't run into each other
+        key.update(b"\0" + repr(value).encode("utf-8"))
+    return key.hexdigest()
+
+
+def read_cached_report(
+    cache_key: str, cache_dir: Path = REPORT_CACHE_DIR
+) -> Optional[list[PyPackage]]:
+    """Return cached pip report requirements, if any.
+
+    Arguments:
+        cache_key -- Key returned by build_cache_key (str)
+
+    Keyword Arguments:
+        cache_dir -- Directory to read cached reports from
+                     (default: {REPORT_CACHE_DIR})
+
+    Returns:
+        Cached packages, or None if not cached or expired (Optional[list[PyPackage]])
+    """
+    cache_file: Path = Path(cache_dir, f"{cache_key}.json")
+    try:
+        if time.time() - cache_file.stat().st_mtime > MAX_CACHE_AGE:
+            cache_file.unlink()
+            return None
+        cached: Any = json.loads(cache_file.read_bytes())
+        # Only non-empty lists of requirements are ever written to the cache
+        if not cached or not isinstance(cached, list):
+            return None
+        return [PyPackage(**package) for package in cached]
+    except (OSError, TypeError, ValueError):
+        # Unreadable or corrupt entries are treated like missing ones
+        return None
+
+
+def write_cached_report(
+    cache_key: str, requirements: list[PyPackage], cache_dir: Path = REPORT_CACHE_DIR
+) -> None:
+    """Store pip report requirements in cache.
+
+    Arguments:
+        cache_key -- Key returned by build_cache_key (str)
+        requirements -- Packages from pip install --report output (list[PyPackage])
+
+    Keyword Arguments:
+        cache_dir -- Directory to store cached reports in
+                     (default: {REPORT_CACHE_DIR})
+    """
+    write_cache_file(
+        cache_file=Path(cache_dir, f"{cache_key}.json"),
+        contents=json.dumps([package._asdict() for package in requirements]),
+    )
+
+
+def write_cache_file(cache_file: Path, contents: str) -> None:
+    """Atomically write cache file, if possible.
+
+    Caching is best effort: If the file can't be written (e.g. read-only or full
+    disk), the cache is simply not updated.
+
+    Arguments:
+        cache_file -- Path to cache file (Path)
+        contents -- Contents to be written to file (str)
+    """
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write to temporary file first so concurrent runs never read partial entries
+        fd, temp_file = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(contents)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        # Don't leave temporary file behind if it couldn't be moved into place
+        with contextlib.suppress(OSError):
+            os.unlink(temp_file)
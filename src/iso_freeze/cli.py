@@ -2,23 +2,63 @@
 different optional dependencies (e.g. 'dev' and 'doc' requirements)."""
 
 import argparse
+import functools
+import os
+import shutil
 import sys
 from typing import Optional
 from pathlib import Path
 
 from iso_freeze.get_requirements import get_pip_report_requirements
-from iso_freeze.lib import run_pip
-from iso_freeze.sync import sync
-from iso_freeze.pin_requirements import pin_requirements
+from iso_freeze.lib import PyPackage, run_pip
 
 
 def get_pip_version(python_exec: Path) -> str:
     """Return pip --version output.
 
+    Reads pip's metadata directly if python_exec is the interpreter running
+    iso-freeze, saving a subprocess.
+
     Returns:
         pip --version output (str)
     """
-    return run_pip(command=[python_exec, "-m", "pip", "--version"], check_output=True)
+    if is_current_interpreter(python_exec):
+        # importlib.metadata is slow to import, so only do so when needed
+        from importlib.metadata import Distribution, PackageNotFoundError, distribution
+
+        try:
+            pip: Distribution = distribution("pip")
+        except PackageNotFoundError:
+            pass
+        else:
+            # Mirror pip --version output: "pip <version> from <path> (python X.Y)"
+            return (
+                f"pip {pip.version} from {pip.locate_file('pip')} "
+                f"(python {sys.version_info.major}.{sys.version_info.minor})"
+            )
+    # Strip trailing newline so output matches the in-process version above
+    return run_pip(
+        command=[python_exec, "-m", "pip", "--version"], check_output=True
+    ).strip()
+
+
+def is_current_interpreter(python_exec: Path) -> bool:
+    """Check if python_exec is the interpreter running iso-freeze.
+
+    Arguments:
+        python_exec -- Path to Python interpreter (Path)
+
+    Returns:
+        True/False (bool)
+    """
+    interpreter: Optional[str] = shutil.which(str(python_exec))
+    if not interpreter:
+        return False
+    # Executables of different virtual environments usually link to the same base
+    # interpreter, so they only count as the same if they are in the same directory
+    return Path(interpreter).absolute().parent == Path(
+        sys.executable
+    ).absolute().parent and os.path.samefile(interpreter, sys.executable)
 
 
 def validate_pip_version(pip_version_output: str) -> bool:
@@ -29,15 +69,12 @@ def validate_pip_version(pip_version_output: str) -> bool:
     """
     # Output of pip --version looks like this:
     # "pip 22.2 from <path to pip> (<python version>)"
-    # To get version number, split this message on whitespace and pick list item 1.
-    # To check against minimum version, turn the version number into a list of ints
-    # (e.g. '[22, 2]' or '[21, 1, 2]')
-    pip_version: list[int] = [
-        int(number) for number in pip_version_output.split()[1].split(".")
-    ]
-    if pip_version >= [22, 2]:
-        return True
-    return False
+    # To get version number, split this message on whitespace and pick item 1.
+    # To check against minimum version, only major and minor version are needed
+    # (e.g. '(22, 2)' for both '22.2' and '22.2.1')
+    major, _, rest = pip_version_output.split(maxsplit=2)[1].partition(".")
+    minor: str = rest.partition(".")[0]
+    return (int(major), int(minor or 0)) >= (22, 2)
 
 
 def determine_default_file() -> Optional[Path]:
@@ -55,8 +92,13 @@ def determine_default_file() -> Optional[Path]:
     return default
 
 
-def parse_args() -> argparse.Namespace:
-    """Parse arguments."""
+@functools.lru_cache(maxsize=None)
+def build_argument_parser() -> argparse.ArgumentParser:
+    """Build argument parser once and reuse it for subsequent calls.
+
+    Returns:
+        Argument parser for iso-freeze CLI (argparse.ArgumentParser)
+    """
     argparser = argparse.ArgumentParser(
         description="Use pip install --report to cleanly separate pinned requirements "
         "for different optional dependencies (e.g. 'dev' and 'doc' requirements)."
@@ -65,7 +107,6 @@ def parse_args() -> argparse.Namespace:
         "file",
         type=Path,
         nargs="?",
-        default=determine_default_file(),
         help="Path to input file. Can be pyproject.toml or requirements file. "
         "Defaults to 'requirements.in' or 'pyproject.toml' in current directory.",
     )
@@ -73,7 +114,8 @@ def parse_args() -> argparse.Namespace:
         "--dependency",
         "-d",
         type=str,
-        help="Name of the optional dependency defined in pyproject.toml to include.",
+        help="Name of the optional dependency defined in pyproject.toml to include. "
+        "Separate multiple names with commas to pin each of them into its own file.",
     )
     argparser.add_argument(
         "--output",
@@ -105,7 +147,21 @@ def parse_args() -> argparse.Namespace:
     argparser.add_argument(
         "--hashes", action="store_true", help="Add hashes to output file."
     )
-    args = argparser.parse_args()
+    argparser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse pip install --report results from previous runs with the same "
+        "input file, interpreter and arguments. Cached results expire after one day.",
+    )
+    return argparser
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse arguments."""
+    args = build_argument_parser().parse_args()
+    # Only look for default files if no file has been specified
+    if not args.file:
+        args.file = determine_default_file()
     if not args.file:
         sys.exit(
             "No requirements.in or pyproject.toml file found in current directory. "
@@ -118,34 +174,192 @@ def parse_args() -> argparse.Namespace:
         )
     if not args.file.is_file():
         sys.exit(f"Not a file: {args.file}")
+    # If optional dependencies have been provided, split them into list
+    if args.dependency:
+        dependencies: list[str] = [
+            dependency.strip() for dependency in args.dependency.split(",")
+        ]
+        if not all(dependencies):
+            sys.exit("Names of optional dependencies must not be empty.")
+        # Drop duplicates while keeping order, so every group is only resolved once
+        args.dependency = list(dict.fromkeys(dependencies))
+        if args.sync and len(args.dependency) > 1:
+            sys.exit("You can only sync with one optional dependency at a time.")
     # If pip-args have been provided, split them into list
     if args.pip_args:
         args.pip_args = args.pip_args.split(" ")
     return args
 
 
-def main() -> None:
-    """ClI entry point."""
-    arguments: argparse.Namespace = parse_args()
-    if not validate_pip_version(pip_version_output=get_pip_version(arguments.python)):
-        sys.exit("pip >= 22.2 required. Please update pip and try again.")
-    pip_report_requirements = get_pip_report_requirements(
+def get_requirements(
+    arguments: argparse.Namespace,
+    pip_version_output: str,
+    optional_dependency: Optional[str],
+) -> Optional[list[PyPackage]]:
+    """Get requirements from pip install --report, or from cache if enabled.
+
+    Arguments:
+        arguments -- Parsed command line arguments (argparse.Namespace)
+        pip_version_output -- pip --version output of the interpreter used (str)
+        optional_dependency -- Optional dependency to include (Optional[str])
+
+    Returns:
+        Pip packages from pip install --report output (Optional[list[PyPackage]])
+    """
+    if arguments.cache:
+        from iso_freeze.cache import (
+            build_cache_key,
+            read_cached_report,
+            write_cached_report,
+        )
+
+        cache_key: str = build_cache_key(
+            file=arguments.file,
+            pip_version_output=pip_version_output,
+            pip_args=arguments.pip_args,
+            optional_dependency=optional_dependency,
+        )
+        cached_requirements: Optional[list[PyPackage]] = read_cached_report(
+            cache_key=cache_key
+        )
+        if cached_requirements is not None:
+            return cached_requirements
+    pip_report_requirements: Optional[list[PyPackage]] = get_pip_report_requirements(
         file=arguments.file,
         python_exec=arguments.python,
         pip_args=arguments.pip_args,
-        optional_dependency=arguments.dependency,
+        optional_dependency=optional_dependency,
     )
-    if pip_report_requirements:
-        if arguments.sync:
-            sync(requirements=pip_report_requirements, python_exec=arguments.python)
-        else:
-            pin_requirements(
-                requirements=pip_report_requirements,
-                hashes=arguments.hashes,
+    if arguments.cache and pip_report_requirements:
+        write_cached_report(cache_key=cache_key, requirements=pip_report_requirements)
+    return pip_report_requirements
+
+
+def get_dependency_output_file(output_file: Path, optional_dependency: str) -> Path:
+    """Name output file after optional dependency (e.g. 'requirements-dev.txt').
+
+    Arguments:
+        output_file -- Output file specified by user (Path)
+        optional_dependency -- Name of optional dependency (str)
+
+    Returns:
+        Output file for optional dependency (Path)
+    """
+    return output_file.with_name(
+        f"{output_file.stem}-{optional_dependency}{output_file.suffix}"
+    )
+
+
+def pin_optional_dependencies(
+    arguments: argparse.Namespace, pip_version_output: str
+) -> None:
+    """Pin requirements for multiple optional dependencies into separate files.
+
+    Arguments:
+        arguments -- Parsed command line arguments (argparse.Namespace)
+        pip_version_output -- pip --version output of the interpreter used (str)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from iso_freeze.pin_requirements import pin_requirements
+
+    # Each resolve runs in its own pip subprocess, so threads suffice to run them
+    # in parallel. pip's resolver is CPU heavy too, so don't start more pip
+    # processes than there are CPUs.
+    with ThreadPoolExecutor(
+        max_workers=min(len(arguments.dependency), os.cpu_count() or 1)
+    ) as executor:
+        all_requirements: list[Optional[list[PyPackage]]] = list(
+            executor.map(
+                lambda optional_dependency: get_requirements(
+                    arguments=arguments,
+                    pip_version_output=pip_version_output,
+                    optional_dependency=optional_dependency,
+                ),
+                arguments.dependency,
+            )
+        )
+    # Like with a single optional dependency, exit if there is nothing to pin, and
+    # do so before writing any file
+    empty_dependencies: list[str] = [
+        f"'{optional_dependency}'"
+        for optional_dependency, requirements in zip(
+            arguments.dependency, all_requirements
+        )
+        if not requirements
+    ]
+    if empty_dependencies:
+        sys.exit(
+            f"There are no requirements to pin for {', '.join(empty_dependencies)}."
+        )
+    for optional_dependency, requirements in zip(
+        arguments.dependency, all_requirements
+    ):
+        pin_requirements(
+            # Checked above, but mypy doesn't know that
+            requirements=requirements,  # type: ignore
+            hashes=arguments.hashes,
+            output_file=get_dependency_output_file(
                 output_file=arguments.output,
+                optional_dependency=optional_dependency,
+            ),
+        )
+
+
+def main() -> None:
+    """ClI entry point."""
+    arguments: argparse.Namespace = parse_args()
+    pip_version_output: str = get_pip_version(arguments.python)
+    if not validate_pip_version(pip_version_output=pip_version_output):
+        sys.exit("pip >= 22.2 required. Please update pip and try again.")
+    if arguments.dependency and len(arguments.dependency) > 1:
+        pin_optional_dependencies(
+            arguments=arguments, pip_version_output=pip_version_output
+        )
+        return
+    optional_dependency: Optional[str] = (
+        arguments.dependency[0] if arguments.dependency else None
+    )
+    # Only import the module required for the selected mode
+    if arguments.sync:
+        from concurrent.futures import Future, ThreadPoolExecutor
+
+        from iso_freeze.sync import get_pip_list_output, sync
+
+        # pip list doesn't depend on the pip report, so run both pip subprocesses
+        # at the same time
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pip_list_future: Future = executor.submit(
+                get_pip_list_output, python_exec=arguments.python
+            )
+            pip_report_requirements: Optional[list[PyPackage]] = get_requirements(
+                arguments=arguments,
+                pip_version_output=pip_version_output,
+                optional_dependency=optional_dependency,
             )
+            pip_list_output: list[dict[str, str]] = pip_list_future.result()
+        if not pip_report_requirements:
+            sys.exit("There are no requirements to pin.")
+        sync(
+            requirements=pip_report_requirements,
+            python_exec=arguments.python,
+            pip_list_output=pip_list_output,
+        )
     else:
-        sys.exit("There are no requirements to pin.")
+        from iso_freeze.pin_requirements import pin_requirements
+
+        pip_report_requirements = get_requirements(
+            arguments=arguments,
+            pip_version_output=pip_version_output,
+            optional_dependency=optional_dependency,
+        )
+        if not pip_report_requirements:
+            sys.exit("There are no requirements to pin.")
+        pin_requirements(
+            requirements=pip_report_requirements,
+            hashes=arguments.hashes,
+            output_file=arguments.output,
+        )
 
 
 if __name__ == "__main__":
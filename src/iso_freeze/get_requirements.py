@@ -1,17 +1,13 @@
 """Getting requirements from pip install --report."""
 
-import json
+import functools
+import os
 import sys
 
 from pathlib import Path
 from typing import Any, Union, Optional
 
-if sys.version_info >= (3, 11, 0):
-    import tomllib
-else:
-    import tomli as tomllib  # type: ignore
-
-from iso_freeze.lib import PyPackage, run_pip
+from iso_freeze.lib import PyPackage, json_loads, run_pip
 
 
 def get_pip_report_requirements(
@@ -67,8 +63,6 @@ def build_pip_report_command(
         Pip command to pass to run_pip_report (list[Union[str, Path]])
     """
     pip_report_command: list[Union[str, Path]] = [
-        "env",
-        "PIP_REQUIRE_VIRTUALENV=false",
         python_exec,
         "-m",
         "pip",
@@ -79,7 +73,15 @@ def build_pip_report_command(
         pip_report_command.extend(pip_args)
     # Add necessary flags for calling pip install report
     pip_report_command.extend(
-        ["-q", "--dry-run", "--ignore-installed", "--report", "-", *pip_report_input]
+        [
+            "-q",
+            "--disable-pip-version-check",
+            "--dry-run",
+            "--ignore-installed",
+            "--report",
+            "-",
+            *pip_report_input,
+        ]
     )
     return pip_report_command
 
@@ -87,14 +89,37 @@ def build_pip_report_command(
 def load_toml_file(toml_file: Path) -> dict[str, Any]:
     """Load TOML file and return its contents
 
+    Files are only parsed again if they changed since they were last loaded. The
+    returned dict is shared between calls and must not be modified.
+
     Arguments:
         toml_file -- Path to TOML file (Path)
 
     Returns:
         Contents of TOML file (dict[str, Any])
     """
-    with open(toml_file, "rb") as f:
-        return tomllib.load(f)
+    return parse_toml_file(
+        toml_file=toml_file.resolve(), mtime_ns=toml_file.stat().st_mtime_ns
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def parse_toml_file(toml_file: Path, mtime_ns: int) -> dict[str, Any]:
+    """Parse TOML file, memoized by path and modification time.
+
+    Arguments:
+        toml_file -- Absolute path to TOML file (Path)
+        mtime_ns -- Modification time of TOML file, part of the cache key (int)
+
+    Returns:
+        Contents of TOML file (dict[str, Any])
+    """
+    # Only import TOML parser when needed, requirements files don't use it
+    if sys.version_info >= (3, 11, 0):
+        import tomllib
+    else:
+        import tomli as tomllib  # type: ignore
+    return tomllib.loads(toml_file.read_text(encoding="utf-8"))
 
 
 def read_toml(
@@ -112,21 +137,25 @@ def read_toml(
     Returns:
         List of dependency names (list[str])
     """
-    if not toml_dict.get("project"):
+    project: Optional[dict[str, Any]] = toml_dict.get("project")
+    if not project:
         sys.exit("TOML file does not contain a 'project' section.")
-    dependencies: list[str] = toml_dict["project"].get("dependencies")
+    # Copy list so that adding optional dependencies doesn't modify toml_dict
+    dependencies: list[str] = list(project.get("dependencies", []))
     if optional_dependency:
-        if not toml_dict["project"].get("optional-dependencies"):
+        optional_dependencies: Optional[dict[str, list[str]]] = project.get(
+            "optional-dependencies"
+        )
+        if not optional_dependencies:
             sys.exit("No optional dependencies defined in TOML file.")
-        optional_dependency_reqs: Optional[list[str]] = (
-            toml_dict["project"].get("optional-dependencies").get(optional_dependency)
+        optional_dependency_reqs: Optional[list[str]] = optional_dependencies.get(
+            optional_dependency
         )
-        if optional_dependency_reqs:
-            dependencies.extend(optional_dependency_reqs)
-        else:
+        if not optional_dependency_reqs:
             sys.exit(
                 f"No optional dependency '{optional_dependency}' found in TOML file."
             )
+        dependencies.extend(optional_dependency_reqs)
     return dependencies
 
 
@@ -139,7 +168,16 @@ def get_pip_report(pip_report_command: list[Union[Path, str]]) -> dict[str, Any]
     Returns:
         Json pip report response (dict[str, Any])
     """
-    return json.loads(run_pip(command=pip_report_command, check_output=True))
+    return json_loads(
+        run_pip(
+            command=pip_report_command,
+            check_output=True,
+            # Make sure pip install --report works even if require-virtualenv = true
+            # is set in pip.conf, since it doesn't install anything
+            env={**os.environ, "PIP_REQUIRE_VIRTUALENV": "false"},
+            text=False,
+        )
+    )
 
 
 def read_pip_report(pip_report: dict[str, Any]) -> Optional[list[PyPackage]]:
@@ -151,21 +189,16 @@ def read_pip_report(pip_report: dict[str, Any]) -> Optional[list[PyPackage]]:
     Returns:
         List of PyPackage objects containing infos to pin requirements (list[PyPackage])
     """
-    if pip_report.get("install"):
-        dependencies: list[PyPackage] = []
-        for package in pip_report["install"]:
-            dependencies.append(
-                PyPackage(
-                    name=package["metadata"]["name"],
-                    version=package["metadata"]["version"],
-                    requested=package["requested"],
-                    # pip report provides hashes in the form 'sha256=<hash>', but pip
-                    # install requires 'sha256:<hash>', so we replace '=' with ':'
-                    hash=package["download_info"]["archive_info"]["hash"].replace(
-                        "=", ":"
-                    ),
-                )
-            )
-        return dependencies
-    else:
+    if not pip_report.get("install"):
         return None
+    return [
+        PyPackage(
+            name=package["metadata"]["name"],
+            version=package["metadata"]["version"],
+            requested=package["requested"],
+            # pip report provides hashes in the form 'sha256=<hash>', but pip
+            # install requires 'sha256:<hash>', so we replace '=' with ':'
+            hash=package["download_info"]["archive_info"]["hash"].replace("=", ":", 1),
+        )
+        for package in pip_report["install"]
+    ]
@@ -3,14 +3,22 @@
 import subprocess
 import sys
 
-from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Union, Optional
+from typing import Any, NamedTuple, Union, Optional
 
+# orjson is an optional dependency that parses large pip reports faster
+try:
+    from orjson import loads as json_loads  # type: ignore # noqa: F401
+except ImportError:
+    from json import loads as json_loads  # type: ignore # noqa: F401
 
-@dataclass
-class PyPackage:
-    """Class to capture relevant information about Python packages."""
+
+class PyPackage(NamedTuple):
+    """Class to capture relevant information about Python packages.
+
+    A NamedTuple rather than a dataclass: instances carry no __dict__, which keeps
+    them small when handling hundreds of packages.
+    """
 
     name: str
     version: str
@@ -18,7 +26,12 @@ class PyPackage:
     hash: Optional[str] = None
 
 
-def run_pip(command: list[Union[str, Path]], check_output: bool) -> Any:
+def run_pip(
+    command: list[Union[str, Path]],
+    check_output: bool,
+    env: Optional[dict[str, str]] = None,
+    text: bool = True,
+) -> Any:
     """Run specified pip command with subprocess and return results, if any.
 
     Arguments:
@@ -26,15 +39,21 @@ def run_pip(command: list[Union[str, Path]], check_output: bool) -> Any:
 
     Keyword Arguments:
         check_output -- Whether to call subprocess.check_output (default: {False})
+        env -- Environment variables for pip, inherited if None (default: {None})
+        text -- Decode output as UTF-8 rather than returning bytes. Pass False for
+                output parsed as JSON: json_loads reads bytes directly, so decoding
+                would be wasted work (default: {True})
 
     Returns:
         Output of pip command, if any (Any)
     """
     try:
         if check_output:
-            return subprocess.check_output(command, encoding="utf-8")
+            return subprocess.check_output(
+                command, encoding="utf-8" if text else None, env=env
+            )
         else:
-            subprocess.run(command)
+            subprocess.run(command, env=env)
             return None
     except subprocess.CalledProcessError as error:
         error.output
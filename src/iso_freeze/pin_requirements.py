@@ -1,9 +1,14 @@
 """Write *requirements.txt file."""
 
+import os
 from pathlib import Path
+from typing import Final
 
 from iso_freeze.lib import PyPackage
 
+TOP_LEVEL_REQUIREMENTS_HEADER: Final[str] = "# Top level requirements"
+DEPENDENCIES_HEADER: Final[str] = "# Dependencies of top level requirements"
+
 
 def pin_requirements(
     requirements: list[PyPackage], hashes: bool, output_file: Path
@@ -36,31 +41,46 @@ def build_reqirements_file_contents(
     Returns:
         Contents of requirements file (list[str])
     """
-    # For easier formatting we create separate lists for top level requirements
-    # and their dependencies
-    top_level_requirements: list[str] = []
-    dependency_requirements: list[str] = []
-    for package in requirements:
-        pinned_format: str = f"{package.name}=={package.version}"
-        if hashes:
-            pinned_format += f" \\\n    --hash={package.hash}"
-        # If requested == True, the package is a top level requirement
-        if package.requested:
-            top_level_requirements.append(pinned_format)
-        else:
-            dependency_requirements.append(pinned_format)
-    # Sort pinned packages alphabetically before writing to file
-    # (case-insensitively thanks to key=str.lower)
-    top_level_requirements.sort(key=str.lower)
-    # Combine lists and add comments
+    # Sort top level requirements (requested == True) before their dependencies,
+    # each group alphabetically (case-insensitively thanks to str.lower)
+    sorted_requirements: list[PyPackage] = sorted(
+        requirements,
+        key=lambda package: (
+            not package.requested,
+            f"{package.name}=={package.version}".lower(),
+        ),
+    )
+    # Check hashes once instead of for every package
+    if hashes:
+        pinned_requirements: list[str] = [
+            f"{package.name}=={package.version} \\\n    --hash={package.hash}"
+            for package in sorted_requirements
+        ]
+    else:
+        pinned_requirements = [
+            f"{package.name}=={package.version}" for package in sorted_requirements
+        ]
+    # Dependencies of top level requirements start at the first package that
+    # hasn't been requested
+    top_level_count: int = next(
+        (
+            index
+            for index, package in enumerate(sorted_requirements)
+            if not package.requested
+        ),
+        len(sorted_requirements),
+    )
+    # Add comments to separate top level requirements from their dependencies
     requirements_file_content: list[str] = [
-        "# Top level requirements",
-        *top_level_requirements,
+        TOP_LEVEL_REQUIREMENTS_HEADER,
+        *pinned_requirements[:top_level_count],
     ]
-    if dependency_requirements:
-        dependency_requirements.sort(key=str.lower)
+    if top_level_count < len(pinned_requirements):
         requirements_file_content.extend(
-            ["# Dependencies of top level requirements", *dependency_requirements]
+            [
+                DEPENDENCIES_HEADER,
+                *pinned_requirements[top_level_count:],
+            ]
         )
     return requirements_file_content
 
@@ -72,5 +92,15 @@ def write_requirements_file(output_file: Path, file_contents: list[str]) -> None
         output_file -- Path to and name of requirements.txt file (Path)
         file_contents -- Contents to to written to a file (list[str])
     """
-    with output_file.open(mode="w", encoding="utf=8") as f:
-        f.writelines(f"{package}\n" for package in file_contents)
+    # Resolve symlinks, so they are written through instead of being replaced
+    target: Path = output_file.resolve()
+    # Write to temporary file and move it into place, so that an interrupted run
+    # never leaves a truncated requirements file behind. Note that an existing file
+    # with the same name as the temporary file is overwritten.
+    temp_file: Path = target.with_name(f"{target.name}.tmp")
+    try:
+        temp_file.write_text("\n".join(file_contents) + "\n", encoding="utf-8")
+        os.replace(temp_file, target)
+    finally:
+        # Only left behind if writing or moving the temporary file failed
+        temp_file.unlink(missing_ok=True)
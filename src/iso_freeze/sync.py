@@ -1,22 +1,41 @@
 """Sync environment with pip install --report output."""
 
-import json
+import re
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Final, Optional
 
-from iso_freeze.lib import PyPackage, run_pip
+from iso_freeze.lib import PyPackage, json_loads, run_pip
 
+# Runs of characters that PEP 503 treats as equivalent in package names
+NAME_SEPARATORS: Final[re.Pattern[str]] = re.compile(r"[-_.]+")
+# Packages never removed by sync: packaging tools preinstalled in virtual
+# environments, iso-freeze itself and, on Python < 3.11, its dependency tomli
+KEEP_INSTALLED: Final[frozenset[str]] = frozenset(
+    ["pip", "setuptools", "wheel", "iso-freeze"]
+    + (["tomli"] if sys.version_info < (3, 11, 0) else [])
+)
 
-def sync(requirements: list[PyPackage], python_exec: Path) -> None:
+
+def sync(
+    requirements: list[PyPackage],
+    python_exec: Path,
+    pip_list_output: Optional[list[dict[str, str]]] = None,
+) -> None:
     """Sync environment with pip install --report output.
 
     Arguments:
         requirements -- List of dependencies to sync with (list[PyPackage])
         python_exec -- Path to Python interpreter to use (Path)
+
+    Keyword Arguments:
+        pip_list_output -- pip list output of the environment, fetched if not
+                           provided (default: {None})
     """
+    if pip_list_output is None:
+        pip_list_output = get_pip_list_output(python_exec=python_exec)
     installed_packages: list[PyPackage] = get_installed_packages(
-        pip_list_output=get_pip_list_output(python_exec=python_exec)
+        pip_list_output=pip_list_output
     )
     additional_packages: Optional[list[str]] = get_additional_packages(
         installed_packages=installed_packages,
@@ -27,10 +46,15 @@ def sync(requirements: list[PyPackage], python_exec: Path) -> None:
             additional_packages=additional_packages,
             python_exec=python_exec,
         )
-    install_pip_report_output(
-        to_install=format_package_list(packages=requirements),
-        python_exec=python_exec,
+    missing_packages: list[PyPackage] = get_missing_packages(
+        installed_packages=installed_packages, to_install=requirements
     )
+    # Only call pip install if packages are missing or need a different version
+    if missing_packages:
+        install_pip_report_output(
+            to_install=format_package_list(packages=missing_packages),
+            python_exec=python_exec,
+        )
 
 
 def get_pip_list_output(python_exec: Path) -> list[dict[str, str]]:
@@ -42,7 +66,7 @@ def get_pip_list_output(python_exec: Path) -> list[dict[str, str]]:
     Returns:
         Pip list output as JSON (list[dict[str, str]])
     """
-    return json.loads(
+    return json_loads(
         run_pip(
             command=[
                 python_exec,
@@ -52,8 +76,10 @@ def get_pip_list_output(python_exec: Path) -> list[dict[str, str]]:
                 "--format",
                 "json",
                 "--exclude-editable",
+                "--disable-pip-version-check",
             ],
             check_output=True,
+            text=False,
         )
     )
 
@@ -87,21 +113,57 @@ def get_additional_packages(
     Returns:
         List of installed packages not in pip report (Optional[list[str]])
     """
-    # Create two lists with packages names only for easy comparison
-    installed_names_only: list[str] = [package.name for package in installed_packages]
-    to_install_names_only: list[str] = [package.name for package in to_install]
-    to_exclude: list[str] = ["pip", "setuptools", "iso-freeze"]
-    if sys.version_info < (3, 11, 0):
-        to_exclude.append("tomli")
+    # pip list and pip install --report don't necessarily spell names the same way
+    # (e.g. 'typing_extensions' and 'typing-extensions'), so compare normalized
+    # names. Packages to install and those never removed share one set for fast
+    # lookups.
+    to_keep: set[str] = {
+        canonicalize_name(package.name) for package in to_install
+    } | KEEP_INSTALLED
+    return [
+        package.name
+        for package in installed_packages
+        if canonicalize_name(package.name) not in to_keep
+    ]
+
+
+def get_missing_packages(
+    installed_packages: list[PyPackage], to_install: list[PyPackage]
+) -> list[PyPackage]:
+    """Filter out packages in pip report that are already installed in that version.
+
+    Arguments:
+        installed_packages -- List of packages installed in current environment
+                              (list[PyPackage])
+        to_install -- List of packages taken from pip install --report
+                      (list[PyPackages])
+
+    Returns:
+        List of packages in pip report that need to be installed (list[PyPackage])
+    """
+    installed: set[tuple[str, str]] = {
+        (canonicalize_name(package.name), package.version)
+        for package in installed_packages
+    }
     return [
         package
-        for package in installed_names_only
-        if package not in to_install_names_only
-        # Don't remove default packages or iso-freeze itself
-        if package not in to_exclude
+        for package in to_install
+        if (canonicalize_name(package.name), package.version) not in installed
     ]
 
 
+def canonicalize_name(name: str) -> str:
+    """Normalize package name as specified in PEP 503.
+
+    Arguments:
+        name -- Package name (str)
+
+    Returns:
+        Normalized package name (str)
+    """
+    return NAME_SEPARATORS.sub("-", name).lower()
+
+
 def remove_additional_packages(
     additional_packages: Optional[list[str]], python_exec: Path
 ) -> None:
@@ -137,6 +199,15 @@ def install_pip_report_output(to_install: list[str], python_exec: Path) -> None:
         python_exec -- Path to Python executable (Path)
     """
     run_pip(
-        command=[python_exec, "-m", "pip", "install", "--upgrade", *to_install],
+        command=[
+            python_exec,
+            "-m",
+            "pip",
+            "install",
+            # pip install --report already resolved all dependencies
+            "--no-deps",
+            "--disable-pip-version-check",
+            *to_install,
+        ],
         check_output=False,
     )
@@ -0,0 +1,160 @@
+import os
+import time
+
+from pathlib import Path
+
+import pytest
+
+from iso_freeze.lib import PyPackage
+from iso_freeze.cache import (
+    MAX_CACHE_AGE,
+    build_cache_key,
+    get_cache_dir,
+    read_cached_report,
+    write_cached_report,
+)
+
+MOCKED_REQUIREMENTS = [
+    PyPackage(name="tomli", version="2.0.1", requested=True, hash="sha256:1234"),
+    PyPackage(name="pyjokes", version="0.6.0", requested=False, hash="sha256:5678"),
+]
+MOCKED_PIP_VERSION_OUTPUT = "pip 22.2 from /funny/path/pip (python 3.9)"
+
+
+def test_build_cache_key(tmp_path: Path) -> None:
+    """Cache key changes whenever any of the inputs changes."""
+    input_file = Path(tmp_path, "requirements.in")
+    input_file.write_text("tomli\n")
+    key_1 = build_cache_key(
+        file=input_file,
+        pip_version_output=MOCKED_PIP_VERSION_OUTPUT,
+        pip_args=None,
+        optional_dependency=None,
+    )
+    assert key_1 == build_cache_key(
+        file=input_file,
+        pip_version_output=MOCKED_PIP_VERSION_OUTPUT,
+        pip_args=None,
+        optional_dependency=None,
+    )
+    assert key_1 != build_cache_key(
+        file=input_file,
+        pip_version_output="pip 22.2 from /funny/path/pip (python 3.10)",
+        pip_args=None,
+        optional_dependency=None,
+    )
+    assert key_1 != build_cache_key(
+        file=input_file,
+        pip_version_output=MOCKED_PIP_VERSION_OUTPUT,
+        pip_args=["--upgrade-strategy", "eager"],
+        optional_dependency=None,
+    )
+    input_file.write_text("tomli\npyjokes\n")
+    assert key_1 != build_cache_key(
+        file=input_file,
+        pip_version_output=MOCKED_PIP_VERSION_OUTPUT,
+        pip_args=None,
+        optional_dependency=None,
+    )
+
+
+def test_build_cache_key_location(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """
+    Identical input files in different directories or used from different working
+    directories get different keys, since they may reference other files relatively.
+    """
+    input_files: list[Path] = []
+    for project in ("a", "b"):
+        Path(tmp_path, project).mkdir()
+        input_file = Path(tmp_path, project, "requirements.in")
+        input_file.write_text("-r base.in\n")
+        input_files.append(input_file)
+    keys: set[str] = set()
+    for input_file in input_files:
+        keys.add(
+            build_cache_key(
+                file=input_file,
+                pip_version_output=MOCKED_PIP_VERSION_OUTPUT,
+                pip_args=None,
+                optional_dependency=None,
+            )
+        )
+    monkeypatch.chdir(tmp_path)
+    keys.add(
+        build_cache_key(
+            file=input_files[0],
+            pip_version_output=MOCKED_PIP_VERSION_OUTPUT,
+            pip_args=None,
+            optional_dependency=None,
+        )
+    )
+    assert len(keys) == 3
+
+
+def test_cached_report_roundtrip(tmp_path: Path) -> None:
+    """Cached requirements are returned unchanged, missing entries return None."""
+    assert read_cached_report(cache_key="missing", cache_dir=tmp_path) is None
+    write_cached_report(
+        cache_key="key", requirements=MOCKED_REQUIREMENTS, cache_dir=tmp_path
+    )
+    assert read_cached_report(cache_key="key", cache_dir=tmp_path) == (
+        MOCKED_REQUIREMENTS
+    )
+
+
+def test_cached_report_invalid(tmp_path: Path) -> None:
+    """Cache entries that can't be turned into packages are ignored."""
+    Path(tmp_path, "corrupt.json").write_text("[{")
+    Path(tmp_path, "unknown.json").write_text('[{"name": "tomli", "unknown": 1}]')
+    assert read_cached_report(cache_key="corrupt", cache_dir=tmp_path) is None
+    assert read_cached_report(cache_key="unknown", cache_dir=tmp_path) is None
+    # Valid JSON, but not a list of packages
+    for cache_key, contents in (("object", "{}"), ("empty", "[]"), ("number", "1")):
+        Path(tmp_path, f"{cache_key}.json").write_text(contents)
+        assert read_cached_report(cache_key=cache_key, cache_dir=tmp_path) is None
+
+
+def test_cached_report_expired(tmp_path: Path) -> None:
+    """Cached requirements older than MAX_CACHE_AGE are discarded."""
+    write_cached_report(
+        cache_key="key", requirements=MOCKED_REQUIREMENTS, cache_dir=tmp_path
+    )
+    expired = time.time() - MAX_CACHE_AGE - 1
+    os.utime(Path(tmp_path, "key.json"), (expired, expired))
+    assert read_cached_report(cache_key="key", cache_dir=tmp_path) is None
+    assert not Path(tmp_path, "key.json").exists()
+
+
+def test_write_cached_report_failure(tmp_path: Path) -> None:
+    """Failing to write cache entries doesn't fail the run or leave files behind."""
+    # Cache directory can't be created because a file is in the way
+    Path(tmp_path, "file").touch()
+    write_cached_report(
+        cache_key="key",
+        requirements=MOCKED_REQUIREMENTS,
+        cache_dir=Path(tmp_path, "file", "reports"),
+    )
+    # Temporary file can't be moved into place because a directory is in the way
+    Path(tmp_path, "key.json").mkdir()
+    write_cached_report(
+        cache_key="key", requirements=MOCKED_REQUIREMENTS, cache_dir=tmp_path
+    )
+    assert sorted(tmp_path.iterdir()) == [
+        Path(tmp_path, "file"),
+        Path(tmp_path, "key.json"),
+    ]
+
+
+def test_get_cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """XDG_CACHE_HOME is used only if it is an absolute path."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    default_cache_dir = Path(tmp_path, ".cache", "iso-freeze")
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    assert get_cache_dir() == default_cache_dir
+    for xdg_cache_home in ("", "relative/cache"):
+        monkeypatch.setenv("XDG_CACHE_HOME", xdg_cache_home)
+        assert get_cache_dir() == default_cache_dir
+    monkeypatch.setenv("XDG_CACHE_HOME", "/xdg/cache")
+    assert get_cache_dir() == Path("/xdg/cache", "iso-freeze")
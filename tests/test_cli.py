@@ -1,10 +1,31 @@
+import argparse
+import functools
 import os
+import subprocess
 import sys
 
 from pathlib import Path
+from typing import Any, Final, Optional
+
 import pytest
 
-from iso_freeze.cli import determine_default_file, validate_pip_version, parse_args
+from iso_freeze.cache import read_cached_report, write_cached_report
+from iso_freeze.cli import (
+    determine_default_file,
+    get_dependency_output_file,
+    get_pip_version,
+    get_requirements,
+    is_current_interpreter,
+    pin_optional_dependencies,
+    validate_pip_version,
+    parse_args,
+)
+from iso_freeze.lib import PyPackage
+
+MOCKED_PIP_VERSION_OUTPUT: Final[str] = "pip 22.2 from /funny/path/pip (python 3.9)"
+TEST_DIRECTORIES: Final[Path] = Path(
+    Path(__file__).parent.resolve(), "test_directories"
+)
 
 
 def test_determine_default() -> None:
@@ -13,33 +34,35 @@ def test_determine_default() -> None:
     directory, or None if neither is present.
     """
     # If only requirements.in found, return that
-    os.chdir(Path(Path(__file__).parent.resolve(), "test_directories", "requirements"))
+    os.chdir(Path(TEST_DIRECTORIES, "requirements"))
     assert determine_default_file() == Path("requirements.in")
     # If only pyproject.toml found, return that
-    os.chdir(Path(Path(__file__).parent.resolve(), "test_directories", "pyproject"))
+    os.chdir(Path(TEST_DIRECTORIES, "pyproject"))
     assert determine_default_file() == Path("pyproject.toml")
     # If neither requirements.in or pyproject.toml, return None
-    os.chdir(Path(Path(__file__).parent.resolve(), "test_directories", "neither"))
+    os.chdir(Path(TEST_DIRECTORIES, "neither"))
     assert determine_default_file() is None
     # If both requirements.in or pyproject.toml, return requirements.in
-    os.chdir(Path(Path(__file__).parent.resolve(), "test_directories", "both"))
+    os.chdir(Path(TEST_DIRECTORIES, "both"))
     assert determine_default_file() == Path("requirements.in")
 
 
-def test_validate_pip_version() -> None:
+@pytest.mark.parametrize(
+    "pip_version_output,expected",
+    [
+        ("pip 22.2 from /funny/path/pip (python 3.9)", True),
+        ("pip 22.1 from /funny/path/pip (python 3.9)", False),
+        ("pip 23.1 from /funny/path/pip (python 3.10)", True),
+        ("pip 20.1.3 from /funny/path/pip (python 3.8)", False),
+        ("pip 34.2.9 from /funny/path/pip (python 3.15)", True),
+        ("pip 23.1.dev0 from /funny/path/pip (python 3.11)", True),
+    ],
+)
+def test_validate_pip_version(pip_version_output: str, expected: bool) -> None:
     """
     Validate pip version number from pip --version output, True if >= 22.2, else False.
     """
-    mocked_pip_version_output_1 = "pip 22.2 from /funny/path/pip (python 3.9)"
-    assert validate_pip_version(pip_version_output=mocked_pip_version_output_1) is True
-    mocked_pip_version_output_2 = "pip 22.1 from /funny/path/pip (python 3.9)"
-    assert validate_pip_version(pip_version_output=mocked_pip_version_output_2) is False
-    mocked_pip_version_output_3 = "pip 23.1 from /funny/path/pip (python 3.10)"
-    assert validate_pip_version(pip_version_output=mocked_pip_version_output_3) is True
-    mocked_pip_version_output_4 = "pip 20.1.3 from /funny/path/pip (python 3.8)"
-    assert validate_pip_version(pip_version_output=mocked_pip_version_output_4) is False
-    mocked_pip_version_output_5 = "pip 34.2.9 from /funny/path/pip (python 3.15)"
-    assert validate_pip_version(pip_version_output=mocked_pip_version_output_5) is True
+    assert validate_pip_version(pip_version_output=pip_version_output) is expected
 
 
 def test_parse_args() -> None:
@@ -47,7 +70,7 @@ def test_parse_args() -> None:
     sys.argv[1:] = ["pyproject.toml", "-d", "dev"]
     test_args1 = parse_args()
     assert test_args1.python == Path("python3")
-    assert test_args1.dependency == "dev"
+    assert test_args1.dependency == ["dev"]
     assert test_args1.file == Path("pyproject.toml")
     assert test_args1.output == Path("requirements.txt")
     sys.argv[1:] = ["requirements.in", "--pip-args", "--upgrade-strategy eager"]
@@ -70,7 +93,8 @@ def test_no_default_file_found() -> None:
     sys.exit() if no file specified and neither requirements.in or pyproject.toml in
     working directory.
     """
-    os.chdir(Path(Path(__file__).parent.resolve(), "test_directories", "neither"))
+    os.chdir(Path(TEST_DIRECTORIES, "neither"))
+    sys.argv[1:] = []
     with pytest.raises(SystemExit) as e:
         parse_args()
     assert e.type == SystemExit
@@ -82,3 +106,202 @@ def test_combine_requirements_dependency() -> None:
     with pytest.raises(SystemExit) as e:
         parse_args()
     assert e.type == SystemExit
+
+
+def test_parse_args_multiple_dependencies() -> None:
+    """Comma-separated optional dependencies are split into list."""
+    os.chdir(Path(TEST_DIRECTORIES, "both"))
+    sys.argv[1:] = ["pyproject.toml", "-d", "dev,doc"]
+    assert parse_args().dependency == ["dev", "doc"]
+
+
+def test_parse_args_duplicate_dependencies() -> None:
+    """Optional dependencies are stripped and de-duplicated, keeping their order."""
+    os.chdir(Path(TEST_DIRECTORIES, "both"))
+    sys.argv[1:] = ["pyproject.toml", "-d", "doc, dev,doc"]
+    assert parse_args().dependency == ["doc", "dev"]
+
+
+@pytest.mark.parametrize("dependency", ["dev,", ",dev", "dev, ,doc", " "])
+def test_parse_args_empty_dependency(dependency: str) -> None:
+    """sys.exit() if any comma-separated optional dependency is empty."""
+    os.chdir(Path(TEST_DIRECTORIES, "both"))
+    sys.argv[1:] = ["pyproject.toml", "-d", dependency]
+    with pytest.raises(SystemExit) as e:
+        parse_args()
+    assert e.type == SystemExit
+
+
+def test_sync_multiple_dependencies() -> None:
+    """sys.exit() when syncing with more than one optional dependency."""
+    os.chdir(Path(TEST_DIRECTORIES, "both"))
+    sys.argv[1:] = ["pyproject.toml", "-d", "dev,doc", "--sync"]
+    with pytest.raises(SystemExit) as e:
+        parse_args()
+    assert e.type == SystemExit
+
+
+def test_get_dependency_output_file() -> None:
+    """Output file for optional dependency is named after it."""
+    assert get_dependency_output_file(
+        output_file=Path("requirements.txt"), optional_dependency="dev"
+    ) == Path("requirements-dev.txt")
+    assert get_dependency_output_file(
+        output_file=Path("requirements", "base.txt"), optional_dependency="doc"
+    ) == Path("requirements", "base-doc.txt")
+
+
+def test_is_current_interpreter() -> None:
+    """Only the interpreter running iso-freeze is detected as current interpreter."""
+    assert is_current_interpreter(Path(sys.executable)) is True
+    assert is_current_interpreter(Path("python that should not exist!!!111")) is False
+
+
+def test_get_pip_version_current_interpreter() -> None:
+    """
+    pip version read in-process for the current interpreter matches pip --version
+    output.
+    """
+    pip_version_output: str = get_pip_version(Path(sys.executable))
+    assert validate_pip_version(pip_version_output=pip_version_output) is True
+    assert (
+        pip_version_output
+        == subprocess.check_output(
+            [sys.executable, "-m", "pip", "--version"], encoding="utf-8"
+        ).strip()
+    )
+
+
+def test_get_requirements_cache(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """With --cache, pip is only asked for a report if none has been cached yet."""
+    pip_report_calls: list[dict[str, Any]] = []
+
+    def mocked_get_pip_report_requirements(**kwargs: Any) -> list[PyPackage]:
+        pip_report_calls.append(kwargs)
+        return [PyPackage(name="tomli", version="2.0.1", requested=True)]
+
+    monkeypatch.setattr(
+        "iso_freeze.cli.get_pip_report_requirements",
+        mocked_get_pip_report_requirements,
+    )
+    cache_dir = Path(tmp_path, "cache")
+    monkeypatch.setattr(
+        "iso_freeze.cache.read_cached_report",
+        functools.partial(read_cached_report, cache_dir=cache_dir),
+    )
+    monkeypatch.setattr(
+        "iso_freeze.cache.write_cached_report",
+        functools.partial(write_cached_report, cache_dir=cache_dir),
+    )
+    input_file = Path(tmp_path, "requirements.in")
+    input_file.write_text("tomli\n")
+    arguments = argparse.Namespace(
+        file=input_file, python=Path("python3"), pip_args=None, cache=True
+    )
+    expected_requirements: list[PyPackage] = [
+        PyPackage(name="tomli", version="2.0.1", requested=True)
+    ]
+    # Cache miss: pip report is requested and result stored
+    assert (
+        get_requirements(
+            arguments=arguments,
+            pip_version_output=MOCKED_PIP_VERSION_OUTPUT,
+            optional_dependency=None,
+        )
+        == expected_requirements
+    )
+    assert len(pip_report_calls) == 1
+    # Cache hit: pip is not called again
+    assert (
+        get_requirements(
+            arguments=arguments,
+            pip_version_output=MOCKED_PIP_VERSION_OUTPUT,
+            optional_dependency=None,
+        )
+        == expected_requirements
+    )
+    assert len(pip_report_calls) == 1
+    # Different pip version: cache miss
+    get_requirements(
+        arguments=arguments,
+        pip_version_output="pip 23.1 from /funny/path/pip (python 3.9)",
+        optional_dependency=None,
+    )
+    assert len(pip_report_calls) == 2
+    # Without --cache, pip is always called
+    arguments.cache = False
+    get_requirements(
+        arguments=arguments,
+        pip_version_output=MOCKED_PIP_VERSION_OUTPUT,
+        optional_dependency=None,
+    )
+    assert len(pip_report_calls) == 3
+
+
+def mocked_optional_dependency_requirements(
+    optional_dependency: Optional[str], **kwargs: Any
+) -> Optional[list[PyPackage]]:
+    """Return pinned packages for 'dev' and 'doc', None for anything else."""
+    if optional_dependency == "dev":
+        return [PyPackage(name="pytest", version="7.1.2", requested=True)]
+    if optional_dependency == "doc":
+        return [PyPackage(name="sphinx", version="5.1.1", requested=True)]
+    return None
+
+
+def test_pin_optional_dependencies(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Each optional dependency is pinned into its own file."""
+    monkeypatch.setattr(
+        "iso_freeze.cli.get_pip_report_requirements",
+        mocked_optional_dependency_requirements,
+    )
+    arguments = argparse.Namespace(
+        file=Path("pyproject.toml"),
+        python=Path("python3"),
+        pip_args=None,
+        cache=False,
+        hashes=False,
+        dependency=["dev", "doc"],
+        output=Path(tmp_path, "requirements.txt"),
+    )
+    pin_optional_dependencies(
+        arguments=arguments, pip_version_output=MOCKED_PIP_VERSION_OUTPUT
+    )
+    assert Path(tmp_path, "requirements-dev.txt").read_text() == (
+        "# Top level requirements\npytest==7.1.2\n"
+    )
+    assert Path(tmp_path, "requirements-doc.txt").read_text() == (
+        "# Top level requirements\nsphinx==5.1.1\n"
+    )
+
+
+def test_pin_optional_dependencies_empty(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """
+    sys.exit() if any optional dependency has no requirements to pin, without
+    writing any file.
+    """
+    monkeypatch.setattr(
+        "iso_freeze.cli.get_pip_report_requirements",
+        mocked_optional_dependency_requirements,
+    )
+    arguments = argparse.Namespace(
+        file=Path("pyproject.toml"),
+        python=Path("python3"),
+        pip_args=None,
+        cache=False,
+        hashes=False,
+        dependency=["dev", "empty"],
+        output=Path(tmp_path, "requirements.txt"),
+    )
+    with pytest.raises(SystemExit) as e:
+        pin_optional_dependencies(
+            arguments=arguments, pip_version_output=MOCKED_PIP_VERSION_OUTPUT
+        )
+    assert e.value.code == "There are no requirements to pin for 'empty'."
+    assert list(tmp_path.iterdir()) == []
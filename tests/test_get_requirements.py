@@ -1,3 +1,5 @@
+import os
+
 from typing import Any, Final, Optional, Union
 from pathlib import Path
 
@@ -5,6 +7,7 @@ import pytest
 
 from iso_freeze.lib import PyPackage
 from iso_freeze.get_requirements import (
+    load_toml_file,
     read_toml,
     read_pip_report,
     build_pip_report_command,
@@ -31,6 +34,34 @@ TEST_NO_OPS_TOML: Final[dict[str, Any]] = {
     }
 }
 
+# Parts shared by all expected pip report commands
+PIP_INSTALL_COMMAND: Final[list[Union[str, Path]]] = [
+    Path("python3"),
+    "-m",
+    "pip",
+    "install",
+]
+PIP_REPORT_FLAGS: Final[list[str]] = [
+    "-q",
+    "--disable-pip-version-check",
+    "--dry-run",
+    "--ignore-installed",
+    "--report",
+    "-",
+]
+
+
+def test_load_toml_file(tmp_path: Path) -> None:
+    """TOML file is only parsed again after it has been modified."""
+    toml_file = Path(tmp_path, "pyproject.toml")
+    toml_file.write_text('[project]\ndependencies = ["tomli"]\n')
+    first_load: dict[str, Any] = load_toml_file(toml_file)
+    assert first_load == {"project": {"dependencies": ["tomli"]}}
+    assert load_toml_file(toml_file) is first_load
+    toml_file.write_text('[project]\ndependencies = ["pytest"]\n')
+    os.utime(toml_file, ns=(0, toml_file.stat().st_mtime_ns + 1))
+    assert load_toml_file(toml_file) == {"project": {"dependencies": ["pytest"]}}
+
 
 def test_read_toml_base_requirements() -> None:
     """Only return base requirements listed in TOML file."""
@@ -53,6 +84,21 @@ def test_read_toml_optional_dependency() -> None:
     ]
 
 
+def test_read_toml_does_not_modify_toml_dict() -> None:
+    """Adding optional dependencies leaves parsed TOML file untouched."""
+    read_toml(toml_dict=TEST_TOML, optional_dependency="dev")
+    assert TEST_TOML["project"]["dependencies"] == ["tomli"]
+
+
+def test_read_toml_no_base_dependencies() -> None:
+    """Return optional dependency only if TOML file lists no base dependencies."""
+    toml_dict: dict[str, Any] = {
+        "project": {"optional-dependencies": {"dev": ["pytest"]}}
+    }
+    assert read_toml(toml_dict=toml_dict, optional_dependency=None) == []
+    assert read_toml(toml_dict=toml_dict, optional_dependency="dev") == ["pytest"]
+
+
 def test_read_toml_missing_optional_dependency() -> None:
     """
     sys.exit() if user specifies an optional dependency that does exist in in TOML
@@ -77,105 +123,76 @@ def test_read_toml_no_project_section() -> None:
         read_toml(toml_dict=TEST_EMPTY_TOML, optional_dependency="something")
 
 
-def test_build_pip_report_command() -> None:
+@pytest.mark.parametrize(
+    "pip_report_input,pip_args,expected_pip_report_command",
+    [
+        # Requirements file
+        (
+            ["-r", Path("requirements.in")],
+            None,
+            [
+                *PIP_INSTALL_COMMAND,
+                *PIP_REPORT_FLAGS,
+                "-r",
+                Path("requirements.in"),
+            ],
+        ),
+        # TOML dependencies
+        (
+            ["tomli", "pytest", "pytest-mock"],
+            None,
+            [
+                *PIP_INSTALL_COMMAND,
+                *PIP_REPORT_FLAGS,
+                "tomli",
+                "pytest",
+                "pytest-mock",
+            ],
+        ),
+        # TOML dependencies with pip-args
+        (
+            ["tomli", "pytest", "pytest-mock"],
+            ["--upgrade-strategy", "eager", "--retries", "10"],
+            [
+                *PIP_INSTALL_COMMAND,
+                "--upgrade-strategy",
+                "eager",
+                "--retries",
+                "10",
+                *PIP_REPORT_FLAGS,
+                "tomli",
+                "pytest",
+                "pytest-mock",
+            ],
+        ),
+        # Requirements file with pip-args
+        (
+            ["-r", Path("requirements.in")],
+            ["--upgrade-strategy", "eager", "--require-hashes"],
+            [
+                *PIP_INSTALL_COMMAND,
+                "--upgrade-strategy",
+                "eager",
+                "--require-hashes",
+                *PIP_REPORT_FLAGS,
+                "-r",
+                Path("requirements.in"),
+            ],
+        ),
+    ],
+)
+def test_build_pip_report_command(
+    pip_report_input: Union[list[str], list[Union[str, Path]]],
+    pip_args: Optional[list[str]],
+    expected_pip_report_command: list[Union[str, Path]],
+) -> None:
     """Translate various inputs into corresponding pip report commands."""
-    # First test: requirements file
-    pip_report_command_1: list[Union[str, Path]] = build_pip_report_command(
-        pip_report_input=["-r", Path("requirements.in")],
-        python_exec=Path("python3"),
-        pip_args=None,
-    )
-    expected_pip_report_command_1 = [
-        "env",
-        "PIP_REQUIRE_VIRTUALENV=false",
-        Path("python3"),
-        "-m",
-        "pip",
-        "install",
-        "-q",
-        "--dry-run",
-        "--ignore-installed",
-        "--report",
-        "-",
-        "-r",
-        Path("requirements.in"),
-    ]
-    assert pip_report_command_1 == expected_pip_report_command_1
-    # Second test: TOML dependencies
-    pip_report_command_2: list[Union[str, Path]] = build_pip_report_command(
-        pip_report_input=["tomli", "pytest", "pytest-mock"],
-        python_exec=Path("python3"),
-        pip_args=None,
-    )
-    expected_pip_report_command_2: list[Union[str, Path]] = [
-        "env",
-        "PIP_REQUIRE_VIRTUALENV=false",
-        Path("python3"),
-        "-m",
-        "pip",
-        "install",
-        "-q",
-        "--dry-run",
-        "--ignore-installed",
-        "--report",
-        "-",
-        "tomli",
-        "pytest",
-        "pytest-mock",
-    ]
-    assert pip_report_command_2 == expected_pip_report_command_2
-    # Third test: TOML dependencies with pip-args
-    pip_report_command_3: list[Union[str, Path]] = build_pip_report_command(
-        pip_report_input=["tomli", "pytest", "pytest-mock"],
-        python_exec=Path("python3"),
-        pip_args=["--upgrade-strategy", "eager", "--retries", "10"],
-    )
-    expected_pip_report_command_3: list[Union[str, Path]] = [
-        "env",
-        "PIP_REQUIRE_VIRTUALENV=false",
-        Path("python3"),
-        "-m",
-        "pip",
-        "install",
-        "--upgrade-strategy",
-        "eager",
-        "--retries",
-        "10",
-        "-q",
-        "--dry-run",
-        "--ignore-installed",
-        "--report",
-        "-",
-        "tomli",
-        "pytest",
-        "pytest-mock",
-    ]
-    assert pip_report_command_3 == expected_pip_report_command_3
-    # Fourth test: requirements file with pip-args
-    pip_report_command_4: list[Union[str, Path]] = build_pip_report_command(
-        pip_report_input=["-r", Path("requirements.in")],
+    pip_report_command: list[Union[str, Path]] = build_pip_report_command(
+        pip_report_input=pip_report_input,
         python_exec=Path("python3"),
-        pip_args=["--upgrade-strategy", "eager", "--require-hashes"],
+        pip_args=pip_args,
     )
-    expected_pip_report_command_4: list[Union[str, Path]] = [
-        "env",
-        "PIP_REQUIRE_VIRTUALENV=false",
-        Path("python3"),
-        "-m",
-        "pip",
-        "install",
-        "--upgrade-strategy",
-        "eager",
-        "--require-hashes",
-        "-q",
-        "--dry-run",
-        "--ignore-installed",
-        "--report",
-        "-",
-        "-r",
-        Path("requirements.in"),
-    ]
-    assert pip_report_command_4 == expected_pip_report_command_4
+    assert pip_report_command == expected_pip_report_command
 
 
 def test_read_pip_report() -> None:
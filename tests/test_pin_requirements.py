@@ -1,5 +1,12 @@
+from pathlib import Path
+
+import pytest
+
 from iso_freeze.lib import PyPackage
-from iso_freeze.pin_requirements import build_reqirements_file_contents
+from iso_freeze.pin_requirements import (
+    build_reqirements_file_contents,
+    write_requirements_file,
+)
 
 MOCKED_REQUIREMENTS = [
     PyPackage(name="tomli", version="2.0.1", requested=True, hash="sha256:1234"),
@@ -7,36 +14,94 @@ MOCKED_REQUIREMENTS = [
 ]
 
 
-def test_build_reqirements_file_contents_no_hashes() -> None:
+@pytest.mark.parametrize(
+    "hashes,expected_output",
+    [
+        (
+            False,
+            [
+                "# Top level requirements",
+                "tomli==2.0.1",
+                "# Dependencies of top level requirements",
+                "pyjokes==0.6.0",
+            ],
+        ),
+        (
+            True,
+            [
+                "# Top level requirements",
+                "tomli==2.0.1 \\\n" "    --hash=sha256:1234",
+                "# Dependencies of top level requirements",
+                "pyjokes==0.6.0 \\\n" "    --hash=sha256:5678",
+            ],
+        ),
+    ],
+)
+def test_build_reqirements_file_contents(
+    hashes: bool, expected_output: list[str]
+) -> None:
     """
     List used to build requirement files adds distinction between top level
-    requirements and their dependencies via comments.
+    requirements and their dependencies via comments, and hashes are added
+    correctly if requested.
     """
-    expected_output_no_hashes: list[str] = [
-        "# Top level requirements",
-        "tomli==2.0.1",
-        "# Dependencies of top level requirements",
-        "pyjokes==0.6.0",
-    ]
-    actual_output_no_hashes: list[str] = build_reqirements_file_contents(
-        requirements=MOCKED_REQUIREMENTS, hashes=False
+    actual_output: list[str] = build_reqirements_file_contents(
+        requirements=MOCKED_REQUIREMENTS, hashes=hashes
     )
-    assert expected_output_no_hashes == actual_output_no_hashes
+    assert expected_output == actual_output
 
 
-def test_build_reqirements_file_contents_with_hashes() -> None:
+def test_build_reqirements_file_contents_sorting() -> None:
     """
-    List used to build requirement files adds distinction between top level
-    requirements and their dependencies via comments, and hashes are added
-    correctly.
+    Top level requirements come before their dependencies, and both are sorted
+    alphabetically regardless of case.
     """
-    expected_output_hashes = [
+    requirements: list[PyPackage] = [
+        PyPackage(name="pluggy", version="1.0.0", requested=False),
+        PyPackage(name="pytest", version="7.1.2", requested=True),
+        PyPackage(name="Attrs", version="21.4.0", requested=False),
+        PyPackage(name="Black", version="22.6.0", requested=True),
+    ]
+    assert build_reqirements_file_contents(requirements=requirements, hashes=False) == [
         "# Top level requirements",
-        "tomli==2.0.1 \\\n" "    --hash=sha256:1234",
+        "Black==22.6.0",
+        "pytest==7.1.2",
         "# Dependencies of top level requirements",
-        "pyjokes==0.6.0 \\\n" "    --hash=sha256:5678",
+        "Attrs==21.4.0",
+        "pluggy==1.0.0",
     ]
-    actual_output_hashes: list[str] = build_reqirements_file_contents(
-        requirements=MOCKED_REQUIREMENTS, hashes=True
+
+
+def test_write_requirements_file(tmp_path: Path) -> None:
+    """Requirements file is replaced as a whole, without leftover temporary file."""
+    output_file = Path(tmp_path, "requirements.txt")
+    output_file.write_text("outdated contents\n")
+    write_requirements_file(
+        output_file=output_file,
+        file_contents=["# Top level requirements", "tomli==2.0.1"],
     )
-    assert expected_output_hashes == actual_output_hashes
+    assert output_file.read_text() == "# Top level requirements\ntomli==2.0.1\n"
+    assert list(tmp_path.iterdir()) == [output_file]
+
+
+def test_write_requirements_file_symlink(tmp_path: Path) -> None:
+    """Symlinked requirements files are written through, not replaced."""
+    output_file = Path(tmp_path, "requirements.txt")
+    Path(tmp_path, "real").mkdir()
+    real_file = Path(tmp_path, "real", "requirements.txt")
+    real_file.write_text("outdated contents\n")
+    output_file.symlink_to(real_file)
+    write_requirements_file(output_file=output_file, file_contents=["tomli==2.0.1"])
+    assert output_file.is_symlink()
+    assert real_file.read_text() == "tomli==2.0.1\n"
+    assert list(Path(tmp_path, "real").iterdir()) == [real_file]
+
+
+def test_write_requirements_file_failure(tmp_path: Path) -> None:
+    """Temporary file is removed if it can't be moved into place."""
+    output_file = Path(tmp_path, "requirements.txt")
+    # Directory in the way of the requirements file
+    output_file.mkdir()
+    with pytest.raises(OSError):
+        write_requirements_file(output_file=output_file, file_contents=["tomli"])
+    assert list(tmp_path.iterdir()) == [output_file]
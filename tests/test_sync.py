@@ -2,7 +2,9 @@ from typing import Optional
 
 from iso_freeze.lib import PyPackage
 from iso_freeze.sync import (
+    canonicalize_name,
     get_additional_packages,
+    get_missing_packages,
     get_installed_packages,
     format_package_list,
 )
@@ -41,10 +43,11 @@ def test_get_additional_packages() -> None:
     """
     mocked_pip_list_output: list[PyPackage] = [
         PyPackage(name="tomli", version="2.0.1", requested=False, hash=None),
-        # Two packages not in mocked pip report output
+        # Packages not in mocked pip report output
         PyPackage(name="pip", version="22.2", requested=False, hash=None),
         PyPackage(name="cowsay", version="5.0", requested=False, hash=None),
         PyPackage(name="iso-freeze", version="0.0.7", requested=False, hash=None),
+        PyPackage(name="wheel", version="0.37.1", requested=False, hash=None),
     ]
     mocked_pip_report_output: list[PyPackage] = [
         PyPackage(name="tomli", version="2.0.1", requested=True, hash="sha256:1234"),
@@ -55,10 +58,58 @@ def test_get_additional_packages() -> None:
         installed_packages=mocked_pip_list_output,
         to_install=mocked_pip_report_output,
     )
-    # pip and iso-freeze should not be removed, cowsay should
+    # pip, iso-freeze and wheel should not be removed, cowsay should
     assert to_delete == ["cowsay"]
 
 
+def test_get_additional_packages_normalized_names() -> None:
+    """Package names that only differ in spelling are treated as the same package."""
+    mocked_pip_list_output: list[PyPackage] = [
+        PyPackage(name="typing_extensions", version="4.3.0"),
+        PyPackage(name="Setuptools", version="63.2.0"),
+        PyPackage(name="cowsay", version="5.0"),
+    ]
+    mocked_pip_report_output: list[PyPackage] = [
+        PyPackage(name="typing-extensions", version="4.3.0", requested=True),
+    ]
+    to_delete: Optional[list[str]] = get_additional_packages(
+        installed_packages=mocked_pip_list_output,
+        to_install=mocked_pip_report_output,
+    )
+    assert to_delete == ["cowsay"]
+
+
+def test_get_missing_packages() -> None:
+    """
+    Packages in report are captured unless they are already installed in the same
+    version.
+    """
+    mocked_pip_list_output: list[PyPackage] = [
+        PyPackage(name="Tomli", version="2.0.1"),
+        PyPackage(name="pyjokes", version="0.5.0"),
+        PyPackage(name="cowsay", version="5.0"),
+    ]
+    mocked_pip_report_output: list[PyPackage] = [
+        PyPackage(name="tomli", version="2.0.1", requested=True, hash="sha256:1234"),
+        # Installed, but in a different version
+        PyPackage(name="pyjokes", version="0.6.0", requested=True, hash="sha256:5678"),
+        # Not installed at all
+        PyPackage(name="attrs", version="21.4.0", requested=False, hash="sha256:90ab"),
+    ]
+    missing_packages: list[PyPackage] = get_missing_packages(
+        installed_packages=mocked_pip_list_output,
+        to_install=mocked_pip_report_output,
+    )
+    assert missing_packages == mocked_pip_report_output[1:]
+
+
+def test_canonicalize_name() -> None:
+    """Package names are normalized as specified in PEP 503."""
+    assert canonicalize_name("Typing_Extensions") == "typing-extensions"
+    assert canonicalize_name("zope.interface") == "zope-interface"
+    assert canonicalize_name("foo-_.bar") == "foo-bar"
+
+
 def test_format_package_list() -> None:
     """
     Lists of PyPackage objects are formatted into lists of strings in a form that can be